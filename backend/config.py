@@ -9,6 +9,19 @@ class Settings(BaseSettings):
     SUPABASE_KEY: str
     SUPABASE_BUCKET: str = "documents"
 
+    # Outbound rate limits (see backend/services/scheduler.py)
+    HF_REQUESTS_PER_SECOND: float = 5.0
+    HF_BURST: float = 10.0
+    HF_MAX_CONCURRENCY: int = 8
+    OPENAI_REQUESTS_PER_SECOND: float = 3.0
+    OPENAI_BURST: float = 5.0
+    OPENAI_MAX_CONCURRENCY: int = 4
+    RATE_LIMIT_MAX_ATTEMPTS: int = 6
+    RATE_LIMIT_DEFAULT_BACKOFF: float = 2.0
+
+    # Connect to Pinecone / Supabase / LLM providers in the background right after startup
+    WARMUP_ON_STARTUP: bool = True
+
     class Config:
         env_file = ".env"
 
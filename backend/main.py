@@ -1,10 +1,28 @@
+import time
+_import_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
-from backend.routes import upload, query, health
+from backend.config import settings
+from backend.routes import upload, query, health, documents
+from backend.services.startup import STARTUP_TIMINGS, warm_up
 import os
+import threading
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    STARTUP_TIMINGS["startup_ms"] = round((time.perf_counter() - _import_started) * 1000, 1)
+    print(f"[INFO] Ready to serve {STARTUP_TIMINGS['startup_ms']} ms after import began")
 
-app = FastAPI(title="RAG Application")
+    # Services are created lazily; warming them in a daemon thread keeps uvicorn
+    # serving immediately even if a dependency is slow or down.
+    if settings.WARMUP_ON_STARTUP:
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    yield
+
+app = FastAPI(title="RAG Application", lifespan=lifespan)
 
 # CORS
 app.add_middleware(
@@ -19,6 +37,7 @@ app.add_middleware(
 app.include_router(upload.router)
 app.include_router(query.router)
 app.include_router(health.router)
+app.include_router(documents.router)
 
 # Mount Frontend
 # Assuming frontend files are in ../frontend relative to where this runs or absolute path
@@ -28,6 +47,9 @@ frontend_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__f
 if os.path.exists(frontend_path):
     app.mount("/", StaticFiles(directory=frontend_path, html=True), name="frontend")
 
+STARTUP_TIMINGS["import_ms"] = round((time.perf_counter() - _import_started) * 1000, 1)
+print(f"[INFO] backend.main imported in {STARTUP_TIMINGS['import_ms']} ms")
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,37 @@
+from fastapi import APIRouter, HTTPException
+from backend.services.pinecone_store import list_documents, list_document_vector_ids, delete_document
+from backend.services.rag_pipeline import QUERY_CACHE
+
+router = APIRouter()
+
+@router.get("/documents")
+def get_documents():
+    try:
+        return {"documents": list_documents()}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/documents/{document_name:path}")
+def get_document(document_name: str):
+    try:
+        ids = list_document_vector_ids(document_name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not ids:
+        raise HTTPException(status_code=404, detail=f"Document '{document_name}' not found")
+    return {"document_name": document_name, "chunks_count": len(ids), "vector_ids": ids}
+
+@router.delete("/documents/{document_name:path}")
+def remove_document(document_name: str):
+    try:
+        deleted = delete_document(document_name)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if not deleted:
+        raise HTTPException(status_code=404, detail=f"Document '{document_name}' not found")
+
+    # Cached answers may have been built from the deleted chunks
+    QUERY_CACHE.clear()
+    return {"message": f"Document '{document_name}' deleted"}
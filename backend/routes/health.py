@@ -1,7 +1,7 @@
 from fastapi import APIRouter
 from backend.config import settings
-from backend.services.pinecone_store import pc
-from openai import OpenAI
+from backend.services.pinecone_store import get_client
+from backend.services.startup import STARTUP_TIMINGS
 import requests
 
 router = APIRouter()
@@ -17,7 +17,7 @@ def health_check():
     
     # Check Pinecone
     try:
-        pc.list_indexes()
+        get_client().list_indexes()
         status["pinecone"] = "reachable"
     except Exception as e:
         status["pinecone"] = f"unreachable: {str(e)}"
@@ -25,6 +25,7 @@ def health_check():
     # Check OpenAI
     if settings.OPENAI_API_KEY:
         try:
+            from openai import OpenAI
             client = OpenAI(api_key=settings.OPENAI_API_KEY)
             client.models.list()
             status["openai"] = "reachable"
@@ -45,8 +46,8 @@ def health_check():
 
     # Check Supabase
     try:
-        from backend.services.storage import SupabaseStorage
-        store = SupabaseStorage()
+        from backend.services.storage import get_storage
+        store = get_storage()
         if store.client:
             buckets = store.client.storage.list_buckets()
             status["supabase"] = {
@@ -58,5 +59,8 @@ def health_check():
             status["supabase"] = "client_init_failed"
     except Exception as e:
         status["supabase"] = f"unreachable: {str(e)}"
+
+    # Snapshot: the warm-up thread may still be adding entries
+    status["startup"] = dict(STARTUP_TIMINGS)
         
     return status
@@ -1,13 +1,32 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from concurrent.futures import ThreadPoolExecutor
 from backend.services.parser import extract_text
 from backend.services.chunker import chunk_text
-from backend.services.embeddings import generate_embedding
-from backend.services.pinecone_store import upsert_vectors
-from backend.services.storage import SupabaseStorage
-import uuid
+from backend.services.embeddings import generate_embedding, EmbeddingError
+from backend.services.scheduler import PRIORITY_BULK
+from backend.config import settings
+from backend.services.pinecone_store import upsert_vectors, make_vector_id, list_document_vector_ids, delete_document_vectors
+from backend.services.storage import get_storage
+from backend.services.rag_pipeline import QUERY_CACHE
 
 router = APIRouter()
-supabase = SupabaseStorage()
+
+def embed_chunks(chunks: list[str]) -> list[list[float]]:
+    # The shared HF scheduler caps the real concurrency and rate; the pool just keeps it saturated.
+    # Bulk priority lets interactive /ask embeddings overtake a large ingestion.
+    with ThreadPoolExecutor(max_workers=settings.HF_MAX_CONCURRENCY) as pool:
+        return list(pool.map(lambda chunk: generate_embedding(chunk, priority=PRIORITY_BULK), chunks))
+
+def store_document(document_name: str, vectors: list[dict]):
+    # Replaces any previous version of the document. The old vectors are only removed
+    # once the new ones are written, so a failed upsert never leaves the document
+    # missing from the index.
+    old_ids = list_document_vector_ids(document_name)
+    upsert_vectors(vectors, document_name=document_name)
+    if old_ids:
+        delete_document_vectors(document_name, old_ids)
+    QUERY_CACHE.clear()
 
 @router.post("/upload")
 async def upload_file(file: UploadFile = File(...)):
@@ -16,7 +35,8 @@ async def upload_file(file: UploadFile = File(...)):
         content = await file.read()
         
         # 1.5 Upload to Supabase Storage
-        file_url = supabase.upload_file(content, file.filename, file.content_type)
+        # Runs in a worker thread: the first call builds the Supabase client (network I/O)
+        file_url = await run_in_threadpool(lambda: get_storage().upload_file(content, file.filename, file.content_type))
         if not file_url:
             print(f"Warning: Supabase upload failed for {file.filename}")
             # We continue even if storage fails, just without preview URL
@@ -30,13 +50,14 @@ async def upload_file(file: UploadFile = File(...)):
         chunks = chunk_text(text)
         
         # 4. Generate Embeddings & Prepare Vectors
+        try:
+            embeddings = await run_in_threadpool(embed_chunks, chunks)
+        except EmbeddingError as e:
+            raise HTTPException(status_code=503, detail=f"Embedding service unavailable, document was not indexed: {e}")
+
         vectors = []
-        for i, chunk in enumerate(chunks):
-            vector_values = generate_embedding(chunk)
-            if len(vector_values) == 0:
-                continue
-                
-            vector_id = f"{file.filename}_{i}_{uuid.uuid4().hex[:6]}"
+        for i, (chunk, vector_values) in enumerate(zip(chunks, embeddings)):
+            vector_id = make_vector_id(file.filename, i)
             vectors.append({
                 "id": vector_id,
                 "values": vector_values,
@@ -48,9 +69,9 @@ async def upload_file(file: UploadFile = File(...)):
                 }
             })
             
-        # 5. Store in Pinecone
+        # 5. Store in Pinecone (blocking Pinecone calls, so off the event loop)
         if vectors:
-            upsert_vectors(vectors)
+            await run_in_threadpool(store_document, file.filename, vectors)
             
         return {
             "message": "File processed successfully", 
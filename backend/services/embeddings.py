@@ -1,38 +1,60 @@
 import requests
 from backend.config import settings
+from backend.services.scheduler import hf_scheduler, RateLimitedError, parse_retry_after, PRIORITY_INTERACTIVE
 import time
 
 # New HF Router Endpoint
 API_URL = "https://router.huggingface.co/hf-inference/models/sentence-transformers/all-MiniLM-L6-v2/pipeline/feature-extraction"
 HEADERS = {"Authorization": f"Bearer {settings.HF_API_KEY}"}
 
-def generate_embedding(text: str, retries=3) -> list[float]:
-    for attempt in range(retries):
-        try:
-            response = requests.post(API_URL, headers=HEADERS, json={"inputs": text}, timeout=10)
-            
-            if response.status_code != 200:
-                print(f"[ERROR] Embedding API Error ({response.status_code}): {response.text}")
-                # Wait before retry if server error
-                if response.status_code >= 500:
-                    time.sleep(1)
-                    continue
-                return []
+class EmbeddingError(Exception):
+    pass
 
-            result = response.json()
-            
-            # Handle different return formats from HF
-            # Expected: [0.1, 0.2, ...] or [[0.1, 0.2, ...]]
-            if isinstance(result, list):
-                if len(result) > 0 and isinstance(result[0], list):
-                    return result[0] # Return first embedding if batch
-                return result # Return direct list
-            
-            print(f"[ERROR] Unexpected embedding format: {type(result)}")
-            return []
+class EmbeddingServerError(EmbeddingError):
+    """A 5xx from the embedding API; worth retrying."""
 
-        except Exception as e:
+def _request_embedding(text: str) -> list[float]:
+    response = requests.post(API_URL, headers=HEADERS, json={"inputs": text}, timeout=10)
+
+    if response.status_code == 429:
+        raise RateLimitedError(f"Embedding API rate limited: {response.text}", parse_retry_after(response.headers))
+    if response.status_code >= 500:
+        raise EmbeddingServerError(f"Embedding API Error ({response.status_code}): {response.text}")
+    if response.status_code != 200:
+        raise EmbeddingError(f"Embedding API Error ({response.status_code}): {response.text}")
+
+    result = response.json()
+    
+    # Handle different return formats from HF
+    # Expected: [0.1, 0.2, ...] or [[0.1, 0.2, ...]]
+    if isinstance(result, list) and len(result) > 0:
+        if isinstance(result[0], list):
+            return result[0] # Return first embedding if batch
+        return result # Return direct list
+    
+    raise EmbeddingError(f"Unexpected embedding format: {type(result)}")
+
+def generate_embedding(text: str, retries=3, priority=PRIORITY_INTERACTIVE) -> list[float]:
+    """
+    Embeds `text` through the shared HF scheduler. 429s are retried by the scheduler
+    (honouring Retry-After); 5xx and transport errors are retried here with exponential
+    backoff. Anything else fails at once. Raises EmbeddingError instead of returning an
+    empty vector so no chunk is lost silently.
+    """
+    last_error = None
+    for attempt in range(retries):
+        try:
+            return hf_scheduler.call(lambda: _request_embedding(text), priority=priority)
+        except (EmbeddingServerError, requests.RequestException) as e:
+            last_error = e
             print(f"[ERROR] Embedding Generation Failed (Attempt {attempt+1}/{retries}): {e}")
-            time.sleep(1)
+            if attempt < retries - 1:
+                time.sleep(2 ** attempt)
+        except RateLimitedError as e:
+            raise EmbeddingError(f"Embedding API still rate limited after scheduler retries: {e}") from e
+        except EmbeddingError:
+            raise
+        except Exception as e:
+            raise EmbeddingError(f"Embedding Generation Failed: {e}") from e
             
-    return []
+    raise EmbeddingError(f"Embedding failed after {retries} attempts: {last_error}")
@@ -1,13 +1,55 @@
-from pinecone import Pinecone, ServerlessSpec
 from backend.config import settings
+import re
+import threading
 import time
-
-pc = Pinecone(api_key=settings.PINECONE_API_KEY)
+import uuid
 
 INDEX_NAME = settings.PINECONE_INDEX
 
+# Every document gets its own namespace so it can be queried, listed and
+# deleted on its own. The default namespace keeps a copy of every vector
+# for global (cross-document) search.
+GLOBAL_NAMESPACE = ""
+DOCUMENT_NAMESPACE_PREFIX = "doc::"
+
+UPSERT_BATCH_SIZE = 100
+DELETE_BATCH_SIZE = 1000
+
+# Vector IDs look like "<document_name>_<chunk_index>_<6 hex chars>". Documents indexed
+# before per-document namespaces only exist in the global namespace, so their IDs are
+# the only way to find them again.
+VECTOR_ID_PATTERN = re.compile(r"^(.+)_\d+_[0-9a-f]{6}$")
+
+_client = None
+_index = None
+# A request arriving during the startup warm-up waits for it instead of repeating
+# (or racing) the client setup and index creation.
+_client_lock = threading.Lock()
+_index_lock = threading.Lock()
+
+def get_client():
+    # Imported and created on first use so loading the app never touches the network
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                from pinecone import Pinecone
+                _client = Pinecone(api_key=settings.PINECONE_API_KEY)
+    return _client
+
 def get_index():
+    # The existence check (and creation) only runs once per process
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = _connect_index()
+    return _index
+
+def _connect_index():
+    pc = get_client()
     if INDEX_NAME not in [index.name for index in pc.list_indexes()]:
+        from pinecone import ServerlessSpec
         pc.create_index(
             name=INDEX_NAME,
             dimension=384, # sentence-transformers/all-MiniLM-L6-v2 dimension
@@ -22,19 +64,136 @@ def get_index():
             
     return pc.Index(INDEX_NAME)
 
-def upsert_vectors(vectors):
+def document_namespace(document_name: str) -> str:
+    return f"{DOCUMENT_NAMESPACE_PREFIX}{document_name}"
+
+def make_vector_id(document_name: str, chunk_index: int) -> str:
+    return f"{document_name}_{chunk_index}_{uuid.uuid4().hex[:6]}"
+
+def upsert_vectors(vectors, document_name=None):
+    """
+    Writes vectors to the document's namespace and then to the global namespace.
+    If any batch fails, the vectors written so far are removed again before re-raising,
+    so a failed upload never leaves duplicate chunks next to the previous version.
+    """
     index = get_index()
-    # Batch upsert is recommended but simple upsert for demo
-    index.upsert(vectors=vectors)
+    namespaces = [GLOBAL_NAMESPACE]
+    if document_name:
+        namespaces.insert(0, document_namespace(document_name))
+
+    try:
+        for namespace in namespaces:
+            for i in range(0, len(vectors), UPSERT_BATCH_SIZE):
+                index.upsert(vectors=vectors[i:i + UPSERT_BATCH_SIZE], namespace=namespace)
+    except Exception:
+        new_ids = [v["id"] for v in vectors]
+        try:
+            for namespace in namespaces:
+                for i in range(0, len(new_ids), DELETE_BATCH_SIZE):
+                    index.delete(ids=new_ids[i:i + DELETE_BATCH_SIZE], namespace=namespace)
+        except Exception as cleanup_err:
+            print(f"[ERROR] Could not roll back partial upsert for '{document_name}': {cleanup_err}")
+        raise
 
-def query_vectors(vector, top_k=5, filter=None):
+def query_vectors(vector, top_k=5, filter=None, namespace=GLOBAL_NAMESPACE):
     index = get_index()
-    return index.query(vector=vector, top_k=top_k, include_metadata=True, filter=filter)
+    return index.query(vector=vector, top_k=top_k, include_metadata=True, filter=filter, namespace=namespace)
+
+def list_documents() -> list[dict]:
+    """
+    Returns every indexed document with its chunk count, read from the namespace stats.
+    Documents indexed before per-document namespaces only show up after running
+    migrate_namespaces.py (see backfill_document_namespaces).
+    """
+    index = get_index()
+    documents = []
+    for namespace, summary in index.describe_index_stats().get('namespaces', {}).items():
+        if namespace.startswith(DOCUMENT_NAMESPACE_PREFIX):
+            documents.append({
+                "document_name": namespace[len(DOCUMENT_NAMESPACE_PREFIX):],
+                "chunks_count": summary.get('vector_count', 0)
+            })
+    return sorted(documents, key=lambda d: d["document_name"])
+
+def backfill_document_namespaces() -> dict:
+    """
+    One-off migration: copies vectors that only exist in the global namespace (documents
+    indexed before per-document namespaces) into their `doc::<name>` namespace.
+    Safe to re-run; documents that already have a namespace are skipped.
+    Returns the number of vectors copied per document.
+    """
+    index = get_index()
+    existing = {
+        namespace[len(DOCUMENT_NAMESPACE_PREFIX):]
+        for namespace in index.describe_index_stats().get('namespaces', {})
+        if namespace.startswith(DOCUMENT_NAMESPACE_PREFIX)
+    }
+
+    copied = {}
+    for page in index.list(namespace=GLOBAL_NAMESPACE):
+        fetched = index.fetch(ids=list(page), namespace=GLOBAL_NAMESPACE)
+        by_document = {}
+        for vector_id, vector in fetched.vectors.items():
+            metadata = vector.metadata or {}
+            match = VECTOR_ID_PATTERN.match(vector_id)
+            document_name = metadata.get("document_name") or (match.group(1) if match else None)
+            if not document_name or document_name in existing:
+                continue
+            by_document.setdefault(document_name, []).append(
+                {"id": vector_id, "values": vector.values, "metadata": metadata}
+            )
+
+        for document_name, vectors in by_document.items():
+            index.upsert(vectors=vectors, namespace=document_namespace(document_name))
+            copied[document_name] = copied.get(document_name, 0) + len(vectors)
+
+    for document_name, count in sorted(copied.items()):
+        print(f"[INFO] Backfilled {count} vectors into namespace for '{document_name}'")
+    return copied
+
+def list_document_vector_ids(document_name: str) -> list[str]:
+    """
+    IDs of every vector belonging to a document, from its own namespace and from the
+    global namespace (which is all there is for documents indexed before namespaces).
+    """
+    index = get_index()
+    ids = []
+    for page in index.list(namespace=document_namespace(document_name)):
+        ids.extend(page)
+
+    # Prefix listing also matches e.g. "a.pdf_v2.pdf_0_..." for "a.pdf", so check the full ID
+    known = set(ids)
+    for page in index.list(prefix=f"{document_name}_", namespace=GLOBAL_NAMESPACE):
+        for vector_id in page:
+            match = VECTOR_ID_PATTERN.match(vector_id)
+            if match and match.group(1) == document_name and vector_id not in known:
+                ids.append(vector_id)
+                known.add(vector_id)
+    return ids
+
+def delete_document_vectors(document_name: str, ids: list[str]):
+    """Deletes the given vectors of a document from both the global and the document namespace."""
+    index = get_index()
+    for namespace in (GLOBAL_NAMESPACE, document_namespace(document_name)):
+        for i in range(0, len(ids), DELETE_BATCH_SIZE):
+            index.delete(ids=ids[i:i + DELETE_BATCH_SIZE], namespace=namespace)
+
+def delete_document(document_name: str) -> bool:
+    """Removes a single document from every namespace. Returns False if the document is not indexed."""
+    ids = list_document_vector_ids(document_name)
+    if not ids:
+        return False
+
+    delete_document_vectors(document_name, ids)
+    print(f"[INFO] Deleted {len(ids)} vectors for document '{document_name}'")
+    return True
 
 def delete_all_vectors():
     index = get_index()
     try:
-        index.delete(delete_all=True)
+        stats = index.describe_index_stats()
+        for namespace in stats.get('namespaces', {}):
+            index.delete(delete_all=True, namespace=namespace)
         print(f"[INFO] All vectors deleted from index '{INDEX_NAME}'")
         return True
     except Exception as e:
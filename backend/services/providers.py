@@ -1,24 +1,33 @@
 from abc import ABC, abstractmethod
-from huggingface_hub import InferenceClient
+from typing import Optional
 from backend.config import settings
+from backend.services.scheduler import hf_scheduler, openai_scheduler, raise_if_rate_limited, PRIORITY_INTERACTIVE
 
 class ModelProvider(ABC):
     @abstractmethod
-    def generate(self, prompt: str) -> str:
+    def generate(self, prompt: str, priority: int = PRIORITY_INTERACTIVE, max_attempts: Optional[int] = None) -> str:
         pass
 
 class HFProvider(ModelProvider):
     def __init__(self):
+        from huggingface_hub import InferenceClient
         self.client = InferenceClient(token=settings.HF_API_KEY)
 
-    def generate(self, prompt: str) -> str:
+    def generate(self, prompt: str, priority: int = PRIORITY_INTERACTIVE, max_attempts: Optional[int] = None) -> str:
+        return hf_scheduler.call(lambda: self._generate(prompt), priority=priority, max_attempts=max_attempts)
+
+    def _generate(self, prompt: str) -> str:
         # Using Mistral-7B-Instruct via HuggingFace Inference API (free)
         messages = [{"role": "user", "content": prompt}]
-        response = self.client.chat_completion(
-            messages, 
-            max_tokens=500, 
-            model="mistralai/Mistral-7B-Instruct-v0.2"
-        )
+        try:
+            response = self.client.chat_completion(
+                messages, 
+                max_tokens=500, 
+                model="mistralai/Mistral-7B-Instruct-v0.2"
+            )
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise
         return response.choices[0].message.content
 
 class OpenAIProvider(ModelProvider):
@@ -29,22 +38,30 @@ class OpenAIProvider(ModelProvider):
             
         try:
             from openai import OpenAI
-            self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
+            # No SDK-level retries: 429s must reach openai_scheduler so it can back off
+            self.client = OpenAI(api_key=settings.OPENAI_API_KEY, max_retries=0)
             self.available = True
         except Exception:
             self.available = False
 
-    def generate(self, prompt: str) -> str:
+    def generate(self, prompt: str, priority: int = PRIORITY_INTERACTIVE, max_attempts: Optional[int] = None) -> str:
         if not self.available:
             raise Exception("OpenAI not available")
-        response = self.client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant."},
-                {"role": "user", "content": prompt}
-            ],
-            max_tokens=500
-        )
+        return openai_scheduler.call(lambda: self._generate(prompt), priority=priority, max_attempts=max_attempts)
+
+    def _generate(self, prompt: str) -> str:
+        try:
+            response = self.client.chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[
+                    {"role": "system", "content": "You are a helpful assistant."},
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=500
+            )
+        except Exception as e:
+            raise_if_rate_limited(e)
+            raise
         return response.choices[0].message.content
 
 class LLMEngine:
@@ -53,12 +70,17 @@ class LLMEngine:
         self.primary = HFProvider()
         self.fallback = OpenAIProvider()
 
-    def generate(self, prompt: str) -> str:
+    def generate(self, prompt: str, priority: int = PRIORITY_INTERACTIVE) -> str:
+        # Interactive calls should not queue behind an HF rate limit when OpenAI can answer now:
+        # skip HF while it is paused and give it a single attempt otherwise.
+        fast_fallback = priority == PRIORITY_INTERACTIVE and self.fallback.available
         try:
-            return self.primary.generate(prompt)
+            if fast_fallback and hf_scheduler.is_paused():
+                raise Exception("HF is rate limited")
+            return self.primary.generate(prompt, priority=priority, max_attempts=1 if fast_fallback else None)
         except Exception as e:
             print(f"Primary (HF) failed: {e}. Trying OpenAI fallback.")
             try:
-                return self.fallback.generate(prompt)
+                return self.fallback.generate(prompt, priority=priority)
             except Exception as e2:
                 return f"Error: Both providers failed. HF: {e}, OpenAI: {e2}"
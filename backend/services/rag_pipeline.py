@@ -1,10 +1,21 @@
 from typing import Optional
 import json
-from backend.services.embeddings import generate_embedding
-from backend.services.pinecone_store import query_vectors
+import threading
+from backend.services.embeddings import generate_embedding, EmbeddingError
+from backend.services.pinecone_store import query_vectors, document_namespace, GLOBAL_NAMESPACE
 from backend.services.providers import LLMEngine
 
-llm = LLMEngine()
+_llm = None
+_llm_lock = threading.Lock()
+
+def get_llm() -> LLMEngine:
+    # Provider clients are built on the first question, not at import time
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                _llm = LLMEngine()
+    return _llm
 
 # Simple in-memory cache
 # Maps "question|context" -> result
@@ -26,7 +37,7 @@ def analyze_query_intent(question: str, current_document: Optional[str] = None)
     )
     
     try:
-        response = llm.generate(prompt)
+        response = get_llm().generate(prompt)
         start = response.find('{')
         end = response.rfind('}') + 1
         if start != -1 and end != -1:
@@ -46,7 +57,7 @@ def process_query(question: str, current_document: Optional[str] = None) -> dict
     # 1. Analyze Intent
     intent = analyze_query_intent(question, current_document)
     if intent.get("is_generic", False):
-        answer = llm.generate(f"Answer helpfully: '{question}'")
+        answer = get_llm().generate(f"Answer helpfully: '{question}'")
         return { "answer": answer, "sources": [] }
 
     # 2. Multi-Query Search
@@ -57,16 +68,24 @@ def process_query(question: str, current_document: Optional[str] = None) -> dict
     all_matches = []
     seen_ids = set()
     
-    pinecone_filter = None
+    # "This file" queries go straight to the document's own namespace
+    namespace = GLOBAL_NAMESPACE
     if is_current_file and current_document:
-        pinecone_filter = {"document_name": {"$eq": current_document}}
+        namespace = document_namespace(current_document)
 
     for q in queries:
-        vector = generate_embedding(q)
-        if not vector: continue
+        try:
+            vector = generate_embedding(q)
+        except EmbeddingError as e:
+            print(f"Embedding error for '{q}': {e}")
+            continue
         
         try:
-            results = query_vectors(vector, top_k=5, filter=pinecone_filter)
+            results = query_vectors(vector, top_k=5, namespace=namespace)
+            if namespace != GLOBAL_NAMESPACE and not results.get('matches'):
+                # Documents indexed before per-document namespaces only live in the global namespace
+                legacy_filter = {"document_name": {"$eq": current_document}}
+                results = query_vectors(vector, top_k=5, filter=legacy_filter)
             for match in results.get('matches', []):
                 if match['id'] not in seen_ids:
                     all_matches.append(match)
@@ -92,7 +111,7 @@ def process_query(question: str, current_document: Optional[str] = None) -> dict
 
     # 4. Final Response
     if not context_chunks:
-        answer = llm.generate(f"Explain that no document info was found for '{question}'.")
+        answer = get_llm().generate(f"Explain that no document info was found for '{question}'.")
         return { "answer": answer, "sources": [] }
 
     context_text = "\n\n".join(context_chunks)
@@ -103,7 +122,7 @@ def process_query(question: str, current_document: Optional[str] = None) -> dict
     )
     
     try:
-        answer = llm.generate(prompt)
+        answer = get_llm().generate(prompt)
         result = { "answer": answer, "sources": list(sources) }
         QUERY_CACHE[cache_key] = result
         return result
@@ -0,0 +1,159 @@
+import heapq
+import itertools
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+from backend.config import settings
+
+T = TypeVar("T")
+
+# Lower value = served first. Interactive /ask traffic jumps ahead of bulk ingestion.
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+class RateLimitedError(Exception):
+    """Raised by a scheduled call when the provider answered 429 (or an equivalent 'slow down')."""
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class TokenBucket:
+    """Classic token bucket: `rate` tokens per second, bursts of up to `capacity`."""
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def try_take(self, now: float) -> float:
+        """Takes a token if one is available and returns 0, otherwise returns seconds until the next one."""
+        self._refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+class ProviderScheduler:
+    """
+    Gatekeeper for a single upstream provider.
+    Combines a token bucket (steady request rate) with an AIMD concurrency limit:
+    every success grows the limit slowly, a 429 halves it (once per pause window, so a
+    burst of 429s counts as one congestion event) and pauses the provider for
+    `Retry-After` seconds. Waiters are served strictly by priority, then FIFO.
+    """
+    def __init__(self, name: str, rate: float, burst: float, max_concurrency: int):
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.max_concurrency = max_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self.paused_until = 0.0
+        self._cond = threading.Condition()
+        self._waiters = []
+        self._seq = itertools.count()
+
+    def _acquire(self, ticket: tuple, requeued: bool = False):
+        with self._cond:
+            if not requeued:
+                heapq.heappush(self._waiters, ticket)
+            try:
+                while True:
+                    now = time.monotonic()
+                    wait = None
+                    if self._waiters[0] != ticket or self.in_flight >= int(self.concurrency_limit):
+                        pass # Woken up by release() or by a higher-priority waiter leaving
+                    elif now < self.paused_until:
+                        wait = self.paused_until - now
+                    else:
+                        wait = self.bucket.try_take(now)
+                        if wait == 0:
+                            break
+                    self._cond.wait(timeout=wait)
+            finally:
+                self._waiters.remove(ticket)
+                heapq.heapify(self._waiters)
+                self._cond.notify_all()
+            self.in_flight += 1
+
+    def is_paused(self) -> bool:
+        with self._cond:
+            return time.monotonic() < self.paused_until
+
+    def _release(self, rate_limited: bool = False, retry_after: Optional[float] = None, failed: bool = False,
+                 requeue: Optional[tuple] = None):
+        with self._cond:
+            self.in_flight -= 1
+            if requeue is not None:
+                # Back into the queue under the same lock and with the original ticket,
+                # so a retried call keeps its place instead of going behind newer waiters
+                heapq.heappush(self._waiters, requeue)
+            now = time.monotonic()
+            if rate_limited:
+                # 429s from requests already in flight when the pause began belong to the same event
+                if now >= self.paused_until:
+                    self.concurrency_limit = max(1.0, self.concurrency_limit / 2)
+                backoff = retry_after if retry_after is not None else settings.RATE_LIMIT_DEFAULT_BACKOFF
+                self.paused_until = max(self.paused_until, now + backoff)
+                print(f"[WARN] {self.name} rate limited; pausing {backoff:.1f}s, concurrency -> {int(self.concurrency_limit)}")
+            elif not failed:
+                self.concurrency_limit = min(float(self.max_concurrency), self.concurrency_limit + 1 / max(1.0, self.concurrency_limit))
+            self._cond.notify_all()
+
+    def call(self, fn: Callable[[], T], priority: int = PRIORITY_INTERACTIVE, max_attempts: Optional[int] = None) -> T:
+        """
+        Runs `fn` once a slot is available. Rate-limited attempts are re-queued (not dropped)
+        until `max_attempts` is exhausted, after which the last RateLimitedError is raised.
+        Any other exception propagates to the caller unchanged.
+        """
+        attempts = max_attempts or settings.RATE_LIMIT_MAX_ATTEMPTS
+        ticket = (priority, next(self._seq))
+        for attempt in range(attempts):
+            self._acquire(ticket, requeued=attempt > 0)
+            try:
+                result = fn()
+            except RateLimitedError as e:
+                retry = attempt < attempts - 1
+                self._release(rate_limited=True, retry_after=e.retry_after, requeue=ticket if retry else None)
+                if not retry:
+                    raise
+                continue
+            except Exception:
+                self._release(failed=True)
+                raise
+            self._release()
+            return result
+
+def parse_retry_after(headers) -> Optional[float]:
+    """Reads a numeric `Retry-After` header (seconds). HTTP-date values are ignored."""
+    if not headers:
+        return None
+    value = headers.get("Retry-After") or headers.get("retry-after")
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+def raise_if_rate_limited(error: Exception):
+    """Converts a provider SDK error carrying an HTTP 429 response into a RateLimitedError."""
+    response = getattr(error, "response", None)
+    if response is not None and getattr(response, "status_code", None) == 429:
+        raise RateLimitedError(str(error), parse_retry_after(getattr(response, "headers", None))) from error
+
+# One scheduler per provider, shared by every request in the process.
+# Embeddings and chat completions both go through the same HF account quota.
+hf_scheduler = ProviderScheduler(
+    "huggingface",
+    rate=settings.HF_REQUESTS_PER_SECOND,
+    burst=settings.HF_BURST,
+    max_concurrency=settings.HF_MAX_CONCURRENCY,
+)
+openai_scheduler = ProviderScheduler(
+    "openai",
+    rate=settings.OPENAI_REQUESTS_PER_SECOND,
+    burst=settings.OPENAI_BURST,
+    max_concurrency=settings.OPENAI_MAX_CONCURRENCY,
+)
@@ -0,0 +1,29 @@
+import time
+
+# Populated as the app boots; exposed via /health so cold-start regressions are visible.
+STARTUP_TIMINGS = {}
+
+def _timed(name: str, fn):
+    started = time.perf_counter()
+    try:
+        fn()
+        STARTUP_TIMINGS[name] = {"status": "ready", "ms": round((time.perf_counter() - started) * 1000, 1)}
+    except Exception as e:
+        STARTUP_TIMINGS[name] = {"status": f"failed: {e}", "ms": round((time.perf_counter() - started) * 1000, 1)}
+        print(f"[WARN] Warm-up of {name} failed: {e}")
+
+def warm_up():
+    """
+    Initializes the lazily created services ahead of the first request.
+    Failures are recorded and logged; each service is retried on first real use.
+    """
+    from backend.services.pinecone_store import get_index
+    from backend.services.rag_pipeline import get_llm
+    from backend.services.storage import get_storage
+
+    started = time.perf_counter()
+    _timed("pinecone", get_index)
+    _timed("llm", get_llm)
+    _timed("supabase", get_storage)
+    STARTUP_TIMINGS["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"[INFO] Warm-up finished in {STARTUP_TIMINGS['warmup_ms']} ms")
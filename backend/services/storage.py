@@ -1,6 +1,7 @@
 import os
 import re
-from supabase import create_client, Client
+import threading
+import time
 from backend.config import settings
 
 class SupabaseStorage:
@@ -14,7 +15,8 @@ class SupabaseStorage:
                 print("Warning: Supabase credentials missing.")
                 self.client = None
             else:
-                self.client: Client = create_client(self.url, self.key)
+                from supabase import create_client
+                self.client = create_client(self.url, self.key)
                 self._ensure_bucket_exists()
 
         except Exception as e:
@@ -114,3 +116,27 @@ class SupabaseStorage:
         # Last resort: construct URL manually
         return f"{self.url}/storage/v1/object/public/{self.bucket}/{filename}"
 
+# After a failed init, wait this long before trying again so a Supabase outage
+# does not turn every upload into a fresh round of blocking network calls.
+STORAGE_RETRY_INTERVAL = 60
+
+_storage = None
+_storage_failed_at = 0.0
+_storage_lock = threading.Lock()
+
+def get_storage() -> SupabaseStorage:
+    """
+    Shared SupabaseStorage, created (and its bucket checked) on first use.
+    SupabaseStorage swallows init errors, so a failed client is rebuilt, but at most
+    once every STORAGE_RETRY_INTERVAL seconds. Blocking: call it from a worker thread.
+    """
+    global _storage, _storage_failed_at
+    if _storage is not None and _storage.client is not None:
+        return _storage
+    with _storage_lock:
+        retry_due = time.monotonic() - _storage_failed_at >= STORAGE_RETRY_INTERVAL
+        if _storage is None or (_storage.client is None and retry_due):
+            _storage = SupabaseStorage()
+            if _storage.client is None:
+                _storage_failed_at = time.monotonic()
+    return _storage
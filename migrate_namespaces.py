@@ -0,0 +1,12 @@
+"""
+One-off migration for indexes created before per-document namespaces.
+Copies every legacy document's vectors into its `doc::<name>` namespace so that
+GET /documents lists it and 'this file' queries hit its namespace directly.
+
+Usage: python migrate_namespaces.py
+"""
+from backend.services.pinecone_store import backfill_document_namespaces
+
+if __name__ == "__main__":
+    copied = backfill_document_namespaces()
+    print(f"Backfilled {sum(copied.values())} vectors across {len(copied)} documents.")
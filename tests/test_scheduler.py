@@ -0,0 +1,127 @@
+import os
+import threading
+import time
+
+# backend.config validates these on import; the scheduler never uses them
+for key in ("PINECONE_API_KEY", "PINECONE_INDEX", "HF_API_KEY", "SUPABASE_URL", "SUPABASE_KEY"):
+    os.environ.setdefault(key, "test")
+
+import pytest
+from backend.services.scheduler import (
+    ProviderScheduler, RateLimitedError, TokenBucket, PRIORITY_BULK, PRIORITY_INTERACTIVE
+)
+
+def make_scheduler(max_concurrency=1):
+    # Rate high enough that the token bucket never delays these tests
+    return ProviderScheduler("test", rate=1000, burst=1000, max_concurrency=max_concurrency)
+
+def wait_for_waiters(scheduler, count, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while len(scheduler._waiters) < count:
+        assert time.monotonic() < deadline, "waiters never queued"
+        time.sleep(0.005)
+
+def test_token_bucket_waits_for_refill():
+    bucket = TokenBucket(rate=10, capacity=1)
+    bucket.updated = 0.0
+    assert bucket.try_take(0.0) == 0
+    assert bucket.try_take(0.0) == pytest.approx(0.1)
+    assert bucket.try_take(0.1) == 0
+
+def test_interactive_overtakes_queued_bulk():
+    scheduler = make_scheduler()
+    order = []
+    holding = threading.Event()
+    release_holder = threading.Event()
+
+    def hold():
+        holding.set()
+        release_holder.wait(2)
+
+    holder = threading.Thread(target=scheduler.call, args=(hold, PRIORITY_BULK))
+    holder.start()
+    holding.wait(2)
+
+    threads = []
+    for name, priority in [("bulk-1", PRIORITY_BULK), ("bulk-2", PRIORITY_BULK), ("interactive", PRIORITY_INTERACTIVE)]:
+        t = threading.Thread(target=scheduler.call, args=(lambda name=name: order.append(name), priority))
+        t.start()
+        threads.append(t)
+        wait_for_waiters(scheduler, len(threads))
+
+    release_holder.set()
+    for t in [holder] + threads:
+        t.join(2)
+
+    assert order == ["interactive", "bulk-1", "bulk-2"]
+
+def test_rate_limit_halves_limit_once_per_pause_window():
+    scheduler = make_scheduler(max_concurrency=8)
+    tickets = [(PRIORITY_BULK, i) for i in range(3)]
+    for ticket in tickets:
+        scheduler._acquire(ticket)
+    for _ in tickets:
+        scheduler._release(rate_limited=True, retry_after=0.5)
+
+    assert scheduler.concurrency_limit == 4
+    assert scheduler.is_paused()
+    assert scheduler.in_flight == 0
+
+def test_rate_limited_call_is_retried_and_limit_recovers():
+    scheduler = make_scheduler(max_concurrency=4)
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RateLimitedError("slow down", retry_after=0.05)
+        return "ok"
+
+    assert scheduler.call(flaky) == "ok"
+    assert len(calls) == 2
+    assert scheduler.concurrency_limit == pytest.approx(2.5)
+
+def test_failures_do_not_grow_the_limit():
+    scheduler = make_scheduler(max_concurrency=4)
+    scheduler.concurrency_limit = 2.0
+
+    def broken():
+        raise TimeoutError()
+
+    with pytest.raises(TimeoutError):
+        scheduler.call(broken)
+    assert scheduler.concurrency_limit == 2.0
+
+def test_exhausted_attempts_raise():
+    scheduler = make_scheduler()
+    calls = []
+
+    def always_limited():
+        calls.append(1)
+        raise RateLimitedError("slow down", retry_after=0)
+
+    with pytest.raises(RateLimitedError):
+        scheduler.call(always_limited, max_attempts=2)
+    assert len(calls) == 2
+
+def test_retried_call_keeps_its_place_in_the_queue():
+    scheduler = make_scheduler()
+    order = []
+    first_attempt = threading.Event()
+
+    def retried():
+        if not first_attempt.is_set():
+            first_attempt.set()
+            wait_for_waiters(scheduler, 1)
+            raise RateLimitedError("slow down", retry_after=0)
+        order.append("retried")
+
+    t1 = threading.Thread(target=scheduler.call, args=(retried, PRIORITY_BULK))
+    t1.start()
+    first_attempt.wait(2)
+    t2 = threading.Thread(target=scheduler.call, args=(lambda: order.append("newer"), PRIORITY_BULK))
+    t2.start()
+    t1.join(2)
+    t2.join(2)
+
+    assert order == ["retried", "newer"]